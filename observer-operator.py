@@ -3,19 +3,45 @@ Kubernetes Operator for Tenant Observer
 Exports metrics in Prometheus format.
 """
 
+import concurrent.futures
+import functools
+import hashlib
 import logging
+import os
+import random
 import threading
-import json
-from decimal import Decimal, ROUND_HALF_UP
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from typing import Dict, List, Any
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Any, Set, Tuple, Callable
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_CEILING
 
 import kubernetes
 import kopf
+import orjson
+import urllib3
 
 OPERATOR_NAME = "tenant-observer"
 NAMESPACE = "tenant-observer"
+RECONCILE_INTERVAL = 30
+RECONCILE_IDLE = 5
+# The reconciler refreshes /tenants every RECONCILE_INTERVAL; requests only
+# aggregate themselves if it has fallen well behind
+TENANTS_TTL = 3 * RECONCILE_INTERVAL
+APPLIED_HASHES_TTL = 10 * RECONCILE_INTERVAL
+LIST_PAGE_SIZE = 500
+API_TIMEOUT = 30
+# Failed informers retry after a delay that doubles up to the max
+INFORMER_BACKOFF = 5
+INFORMER_BACKOFF_MAX = 300
+# Counting secrets needs cluster-wide list on secrets, which exposes their data to our token
+COUNT_SECRETS = os.environ.get('COUNT_SECRETS', '').lower() in ('1', 'true', 'yes')
+# Minimum server-side watch timeout; each watch picks a random value up to twice this
+WATCH_TIMEOUT = 300
+CONNECTION_POOL_SIZE = 32
+# Responses larger than the threshold are written in slices, without copying
+WRITE_CHUNK_THRESHOLD = 1024 * 1024
+WRITE_CHUNK_SIZE = 64 * 1024
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,239 +49,567 @@ logging.basicConfig(
 )
 logger = logging.getLogger(OPERATOR_NAME)
 
+# Shared pool for blocking per-tenant API calls
+EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix='observer')
+
+
+# Quantity suffixes keyed by a single character: binary ones are followed by 'i'
+_MEM_BINARY = {'K': 1024, 'M': 1024**2, 'G': 1024**3, 'T': 1024**4, 'P': 1024**5, 'E': 1024**6}
+_MEM_DECIMAL = {'k': 1000, 'M': 1000**2, 'G': 1000**3, 'T': 1000**4, 'P': 1000**5, 'E': 1000**6}
 
-def to_decimal(value) -> Decimal:
-    """Safe conversion to Decimal"""
-    if value is None:
-        return Decimal('0')
-    if isinstance(value, Decimal):
-        return value
-    if isinstance(value, (int, float)):
-        return Decimal(str(value))
-    try:
-        return Decimal(str(value))
-    except:
-        return Decimal('0')
 
+def _to_int(value: Decimal) -> int:
+    """Round a quantity up to a whole unit, as the apiserver does"""
+    return int(value.to_integral_value(ROUND_CEILING))
 
-def parse_cpu(cpu_str: str) -> Decimal:
+
+def parse_cpu(cpu_str: str) -> int:
+    """CPU quantity in millicores"""
     if not cpu_str:
-        return Decimal('0')
+        return 0
     cpu_str = cpu_str.strip()
-    if cpu_str.endswith('m'):
-        return Decimal(cpu_str[:-1]) / Decimal('1000')
-    return Decimal('0')
+    try:
+        if cpu_str.endswith('m'):
+            return _to_int(Decimal(cpu_str[:-1]))
+        return _to_int(Decimal(cpu_str) * 1000)
+    except InvalidOperation:
+        return 0
 
 
-def parse_memory(mem_str: str) -> Decimal:
+def parse_memory(mem_str: str) -> int:
+    """Memory quantity in bytes"""
     if not mem_str:
-        return Decimal('0')
+        return 0
     mem_str = mem_str.strip()
-    multipliers = {'Ki': 1024, 'Mi': 1024**2, 'Gi': 1024**3, 'Ti': 1024**4}
-    for suffix, mult in multipliers.items():
-        if mem_str.endswith(suffix):
-            try:
-                return Decimal(mem_str[:-len(suffix)]) * mult
-            except:
-                return Decimal('0')
-    return Decimal('0')
+    try:
+        last = mem_str[-1]
+        if last == 'i' and len(mem_str) >= 2:
+            return _to_int(Decimal(mem_str[:-2]) * _MEM_BINARY[mem_str[-2]])
+        mult = _MEM_DECIMAL.get(last)
+        if mult is not None:
+            return _to_int(Decimal(mem_str[:-1]) * mult)
+        return _to_int(Decimal(mem_str))
+    except (InvalidOperation, KeyError, IndexError):
+        return 0
 
 
-def format_cpu(cores: Decimal) -> str:
-    cores = to_decimal(cores)
-    if cores >= 1:
-        return f"{float(cores):.2f} cores"
-    return f"{int(cores * 1000)}m"
+def format_cpu(milli: int) -> str:
+    if milli >= 1000:
+        return f"{milli / 1000:.2f} cores"
+    return f"{milli}m"
 
 
-def format_memory(bytes_val: Decimal) -> str:
-    bytes_val = to_decimal(bytes_val)
+def format_memory(bytes_val: int) -> str:
     if bytes_val >= 1024**4:
-        return f"{float(bytes_val / 1024**4):.2f} Ti"
+        return f"{bytes_val / 1024**4:.2f} Ti"
     if bytes_val >= 1024**3:
-        return f"{float(bytes_val / 1024**3):.2f} Gi"
+        return f"{bytes_val / 1024**3:.2f} Gi"
     if bytes_val >= 1024**2:
-        return f"{float(bytes_val / 1024**2):.2f} Mi"
+        return f"{bytes_val / 1024**2:.2f} Mi"
     if bytes_val >= 1024:
-        return f"{float(bytes_val / 1024):.2f} Ki"
-    return f"{int(bytes_val)} B"
+        return f"{bytes_val / 1024:.2f} Ki"
+    return f"{bytes_val} B"
+
+
+HEALTH_STATUSES = ('healthy', 'warning', 'critical')
+
+# Characters replaced by '_' in tenant label values, in a single pass
+_LABEL_TRANS = str.maketrans({'.': '_', '-': '_', '/': '_'})
+
+_HELP = {
+    'tenant_observer_namespace_count': 'Number of namespaces per tenant',
+    'tenant_observer_cpu_requested_cores': 'CPU requested by tenant pods, in cores',
+    'tenant_observer_cpu_limit_cores': 'CPU limit of tenant pods, in cores',
+    'tenant_observer_memory_requested_bytes': 'Memory requested by tenant pods, in bytes',
+    'tenant_observer_memory_limit_bytes': 'Memory limit of tenant pods, in bytes',
+    'tenant_observer_cpu_requested_percentage': 'CPU requests as a percentage of CPU limits',
+    'tenant_observer_memory_requested_percentage': 'Memory requests as a percentage of memory limits',
+    'tenant_observer_pods_count': 'Number of tenant pods by state',
+    'tenant_observer_services_count': 'Number of services per tenant',
+    'tenant_observer_health_score': 'Tenant health score (0-100)',
+    'tenant_observer_total_tenants': 'Number of tenants',
+    'tenant_observer_total_namespaces': 'Number of namespaces across all tenants',
+    'tenant_observer_total_cpu_requested_cores': 'CPU requested across all tenants, in cores',
+    'tenant_observer_total_memory_requested_bytes': 'Memory requested across all tenants, in bytes',
+    'tenant_observer_total_pods': 'Number of pods across all tenants',
+    'tenant_observer_cluster_health_score': 'Average tenant health score (0-100)',
+    'tenant_observer_build_info': 'Operator build information',
+}
 
 
 class PrometheusMetrics:
     def __init__(self):
         self.gauges = {}
+        self._tenant_names: Dict[str, str] = {}
+        self._cached_lock = threading.Lock()
+        self._cached_bytes = b''
+        self.render()
+    
+    def _tenant(self, tenant: str) -> str:
+        """Sanitized tenant label value, computed once per tenant"""
+        value = self._tenant_names.get(tenant)
+        if value is None:
+            value = self._tenant_names[tenant] = tenant.translate(_LABEL_TRANS)
+        return value
     
-    def _labels(self, d: Dict) -> tuple:
-        return tuple(sorted((k, v.replace('.', '_').replace('-', '_')) for k, v in d.items()))
-    
-    def set(self, name: str, value: float, labels: Dict = None):
-        key = (name.replace('-', '_'), self._labels(labels or {}))
-        self.gauges[key] = value
+    # Setters build label tuples directly; metric names are already valid
     
     def tenant_namespace_count(self, tenant: str, count: int):
-        self.set('tenant_observer_namespace_count', float(count), {'tenant': tenant})
+        self.gauges[('tenant_observer_namespace_count', (('tenant', self._tenant(tenant)),))] = float(count)
     
     def tenant_cpu_requested(self, tenant: str, cores: float):
-        self.set('tenant_observer_cpu_requested_cores', cores, {'tenant': tenant})
+        self.gauges[('tenant_observer_cpu_requested_cores', (('tenant', self._tenant(tenant)),))] = cores
     
     def tenant_cpu_limit(self, tenant: str, cores: float):
-        self.set('tenant_observer_cpu_limit_cores', cores, {'tenant': tenant})
+        self.gauges[('tenant_observer_cpu_limit_cores', (('tenant', self._tenant(tenant)),))] = cores
     
     def tenant_memory_requested(self, tenant: str, bytes_val: float):
-        self.set('tenant_observer_memory_requested_bytes', bytes_val, {'tenant': tenant})
+        self.gauges[('tenant_observer_memory_requested_bytes', (('tenant', self._tenant(tenant)),))] = bytes_val
     
     def tenant_memory_limit(self, tenant: str, bytes_val: float):
-        self.set('tenant_observer_memory_limit_bytes', bytes_val, {'tenant': tenant})
+        self.gauges[('tenant_observer_memory_limit_bytes', (('tenant', self._tenant(tenant)),))] = bytes_val
     
     def tenant_cpu_pct(self, tenant: str, pct: float):
-        self.set('tenant_observer_cpu_requested_percentage', pct, {'tenant': tenant})
+        self.gauges[('tenant_observer_cpu_requested_percentage', (('tenant', self._tenant(tenant)),))] = pct
     
     def tenant_memory_pct(self, tenant: str, pct: float):
-        self.set('tenant_observer_memory_requested_percentage', pct, {'tenant': tenant})
+        self.gauges[('tenant_observer_memory_requested_percentage', (('tenant', self._tenant(tenant)),))] = pct
     
     def tenant_pods(self, tenant: str, state: str, count: int):
-        self.set('tenant_observer_pods_count', float(count), {'tenant': tenant, 'state': state})
+        self.gauges[('tenant_observer_pods_count', (('tenant', self._tenant(tenant)), ('state', state)))] = float(count)
     
     def tenant_services(self, tenant: str, count: int):
-        self.set('tenant_observer_services_count', float(count), {'tenant': tenant})
+        self.gauges[('tenant_observer_services_count', (('tenant', self._tenant(tenant)),))] = float(count)
     
     def tenant_health(self, tenant: str, score: float, status: str):
-        self.set('tenant_observer_health_score', score, {'tenant': tenant, 'status': status})
+        name = self._tenant(tenant)
+        for other in HEALTH_STATUSES:
+            self.gauges.pop(('tenant_observer_health_score', (('tenant', name), ('status', other))), None)
+        self.gauges[('tenant_observer_health_score', (('tenant', name), ('status', status)))] = score
     
     def total_tenants(self, count: int):
-        self.set('tenant_observer_total_tenants', float(count), {})
+        self.gauges[('tenant_observer_total_tenants', ())] = float(count)
     
     def total_namespaces(self, count: int):
-        self.set('tenant_observer_total_namespaces', float(count), {})
+        self.gauges[('tenant_observer_total_namespaces', ())] = float(count)
     
     def total_cpu(self, cores: float):
-        self.set('tenant_observer_total_cpu_requested_cores', cores, {})
+        self.gauges[('tenant_observer_total_cpu_requested_cores', ())] = cores
     
     def total_memory(self, bytes_val: float):
-        self.set('tenant_observer_total_memory_requested_bytes', bytes_val, {})
+        self.gauges[('tenant_observer_total_memory_requested_bytes', ())] = bytes_val
     
     def total_pods(self, count: int):
-        self.set('tenant_observer_total_pods', float(count), {})
+        self.gauges[('tenant_observer_total_pods', ())] = float(count)
     
     def cluster_health(self, score: float, status: str):
-        self.set('tenant_observer_cluster_health_score', score, {'status': status})
+        for other in HEALTH_STATUSES:
+            self.gauges.pop(('tenant_observer_cluster_health_score', (('status', other),)), None)
+        self.gauges[('tenant_observer_cluster_health_score', (('status', status),))] = score
     
-    def generate(self) -> str:
-        lines = ['# HELP tenant_observer_namespace_count Number of namespaces', '# TYPE tenant_observer_namespace_count gauge']
+    def generate(self) -> bytes:
+        families = {}
         for (name, labels), value in self.gauges.items():
-            lbl = ''
-            if labels:
-                lbl = '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
-            lines.append(f'{name}{lbl} {value}')
-        lines.append(f'tenant_observer_build_info{{operator="{OPERATOR_NAME}"}} 1')
-        return '\n'.join(lines)
-    
-    def clear(self):
-        self.gauges.clear()
+            families.setdefault(name, []).append((labels, value))
+        families['tenant_observer_build_info'] = [((('operator', OPERATOR_NAME),), 1)]
+        
+        buf = bytearray()
+        append = buf.extend
+        for name, samples in families.items():
+            bname = name.encode()
+            append(b'# HELP %s %s\n# TYPE %s gauge\n' % (bname, _HELP.get(name, name).encode(), bname))
+            for labels, value in samples:
+                append(bname)
+                if labels:
+                    append(b'{')
+                    first = True
+                    for k, v in labels:
+                        if not first:
+                            append(b',')
+                        first = False
+                        append(k.encode())
+                        append(b'="')
+                        append(v.encode())
+                        append(b'"')
+                    append(b'}')
+                append(b' ')
+                append(repr(float(value)).encode())
+                append(b'\n')
+        return bytes(buf)
+    
+    def render(self):
+        """Rebuild the exposition served on /metrics"""
+        data = self.generate()
+        with self._cached_lock:
+            self._cached_bytes = data
+    
+    def delete_tenant(self, tenant: str):
+        """Drop every series labelled with `tenant`"""
+        name = self._tenant_names.pop(tenant, None)
+        if name is None:
+            return
+        label = ('tenant', name)
+        for key in [k for k in self.gauges if label in k[1]]:
+            del self.gauges[key]
 
 
 metrics = PrometheusMetrics()
 
 
+_api_client = None
 _crd_client = None
 _core_client = None
 
 
+def api_client():
+    """ApiClient shared by all API wrappers, so they reuse one connection pool"""
+    global _api_client
+    if _api_client is None:
+        configuration = kubernetes.client.Configuration.get_default_copy()
+        # room for one long-lived watch per informer plus every EXECUTOR worker
+        configuration.connection_pool_maxsize = CONNECTION_POOL_SIZE
+        _api_client = kubernetes.client.ApiClient(configuration)
+    return _api_client
+
+
 def crd():
     global _crd_client
     if _crd_client is None:
-        _crd_client = kubernetes.client.CustomObjectsApi()
+        _crd_client = kubernetes.client.CustomObjectsApi(api_client())
     return _crd_client
 
 
 def core():
     global _core_client
     if _core_client is None:
-        _core_client = kubernetes.client.CoreV1Api()
+        _core_client = kubernetes.client.CoreV1Api(api_client())
     return _core_client
 
 
-def list_tenants() -> List[Dict]:
-    try:
-        r = crd().list_cluster_custom_object(group="capsule.clastix.io", version="v1beta1", plural="tenants")
-        return r.get('items', []) if isinstance(r, dict) else []
-    except:
-        return []
-
+_cache_lock = threading.RLock()
+_tenants: Dict[str, Dict] = {}
+_tenant_namespaces: Dict[str, Set[str]] = {}
+_tenant_by_namespace: Dict[str, str] = {}
+_ns_usage: Dict[str, Dict] = {}
+# Tenants whose gathered data is stale; consumed by aggregate()
+_dirty_tenants: Set[str] = set()
+# Wakes run_reconciler() once anything is marked dirty
+_dirty = threading.Event()
+# Monotonic time until which the apiserver asked us to back off (429/503)
+_throttled_until = 0.0
 
-def get_namespaces(tenant: str) -> List[str]:
-    try:
-        ns = core().list_namespace(label_selector=f"capsule.clastix.io/tenant={tenant}")
-        return [n.metadata.name for n in ns.items]
-    except:
-        return []
+_PHASE_KEYS = {'Running': 'pods_run', 'Pending': 'pods_wait', 'Failed': 'pods_fail'}
 
 
-def get_namespace_usage(ns_name: str) -> Dict:
-    usage = {
-        'cpu_req': Decimal('0'), 'cpu_lim': Decimal('0'),
-        'mem_req': Decimal('0'), 'mem_lim': Decimal('0'),
+def _empty_usage() -> Dict:
+    return {
+        'cpu_req': 0, 'cpu_lim': 0,
+        'mem_req': 0, 'mem_lim': 0,
         'pods': 0, 'pods_run': 0, 'pods_wait': 0, 'pods_fail': 0,
         'svc': 0, 'cm': 0, 'secret': 0
     }
+
+
+class Informer:
+    """LIST+WATCH cache of one resource kind, keyed by (namespace, name).
+
+    Only the compact entry returned by `extract` is kept per object; every
+    change is reported to `on_change(key, old, new)` with `None` standing for
+    an absent object, so derived indexes can be maintained incrementally.
+    """
+
+    def __init__(self, name: str, list_fn: Callable, extract: Callable, on_change: Callable, **kwargs):
+        self.name = name
+        self.list_fn = list_fn
+        self.extract = extract
+        self.on_change = on_change
+        self.kwargs = kwargs
+        self.items: Dict[Tuple[str, str], Any] = {}
+
+    def _apply(self, key: Tuple[str, str], new):
+        old = self.items.get(key)
+        if new is None:
+            self.items.pop(key, None)
+        else:
+            self.items[key] = new
+        if old != new:
+            self.on_change(key, old, new)
+
+    def _relist(self) -> str:
+        # No resourceVersion=0: the watch cache would ignore `limit` and send
+        # everything at once, while a quorum read is actually served in pages
+        fresh, rv = _paginated_list(self.list_fn, self.extract, **self.kwargs)
+        with _cache_lock:
+            for key in [k for k in self.items if k not in fresh]:
+                self._apply(key, None)
+            for key, entry in fresh.items():
+                self._apply(key, entry)
+        logger.info(f"Informer {self.name} synced: {len(fresh)} objects")
+        return rv
+
+    def run(self):
+        rv = None
+        backoff = INFORMER_BACKOFF
+        while True:
+            try:
+                if rv is None:
+                    rv = self._relist()
+                    backoff = INFORMER_BACKOFF
+                # Randomized like client-go, so informers don't all reconnect at once; the
+                # read timeout catches half-open connections the server never closes
+                timeout = random.randint(WATCH_TIMEOUT, 2 * WATCH_TIMEOUT)
+                # return_type='object' keeps events as plain dicts instead of models
+                watch = kubernetes.watch.Watch(return_type='object')
+                for event in watch.stream(self.list_fn, resource_version=rv, timeout_seconds=timeout,
+                                          _request_timeout=(API_TIMEOUT, timeout + API_TIMEOUT), **self.kwargs):
+                    if event['type'] not in ('ADDED', 'MODIFIED', 'DELETED'):
+                        continue
+                    obj = event['object']
+                    entry = None if event['type'] == 'DELETED' else self.extract(obj)
+                    with _cache_lock:
+                        self._apply(_key(obj['metadata']), entry)
+                # The server ended the watch after timeout_seconds: resume from the last event
+                rv = watch.resource_version
+            except kubernetes.client.exceptions.ApiException as e:
+                rv = None
+                if e.status in (429, 503):
+                    delay = _throttle(e)
+                    logger.warning(f"Informer {self.name} throttled, retrying in {delay}s")
+                    time.sleep(delay)
+                elif e.status in (401, 403):
+                    # Retrying can't fix missing RBAC; stop rather than relist forever
+                    logger.error(f"Informer {self.name} stopped: {e.status} {e.reason}")
+                    return
+                # 410 Gone: our resourceVersion expired, relist right away
+                elif e.status != 410:
+                    logger.warning(f"Informer {self.name} failed: {e.status} {e.reason}, retrying in {backoff}s")
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, INFORMER_BACKOFF_MAX)
+            except Exception as e:
+                rv = None
+                logger.warning(f"Informer {self.name} failed: {e}, retrying in {backoff}s")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, INFORMER_BACKOFF_MAX)
+
+
+def _throttle(e: kubernetes.client.exceptions.ApiException) -> int:
+    """Honour Retry-After from a 429/503; returns the delay in seconds"""
+    global _throttled_until
     try:
-        pods = core().list_namespaced_pod(namespace=ns_name)
-        for pod in pods.items:
-            phase = pod.status.phase
-            if phase == 'Running':
-                usage['pods_run'] += 1
-            elif phase == 'Pending':
-                usage['pods_wait'] += 1
-            elif phase == 'Failed':
-                usage['pods_fail'] += 1
-            usage['pods'] += 1
-            
-            for c in pod.spec.containers:
-                r = c.resources
-                if r:
-                    req = r.requests or {}
-                    lim = r.limits or {}
-                    usage['cpu_req'] += parse_cpu(req.get('cpu', '0'))
-                    usage['cpu_lim'] += parse_cpu(lim.get('cpu', '0'))
-                    usage['mem_req'] += parse_memory(req.get('memory', '0'))
-                    usage['mem_lim'] += parse_memory(lim.get('memory', '0'))
-    except:
-        pass
-    
-    try:
-        usage['svc'] = len(core().list_namespaced_service(namespace=ns_name).items)
-        usage['cm'] = len(core().list_namespaced_config_map(namespace=ns_name).items)
-        usage['secret'] = len(core().list_namespaced_secret(namespace=ns_name).items)
-    except:
-        pass
-    
+        delay = int((e.headers or {}).get('Retry-After', 1))
+    except ValueError:
+        delay = 1
+    _throttled_until = max(_throttled_until, time.monotonic() + delay)
+    return delay
+
+
+def _paginated_list(fn: Callable, extract: Callable, **kwargs) -> Tuple[Dict, str]:
+    """Run a LIST page by page; returns extracted entries by key and the list resourceVersion"""
+    entries = {}
+    cont = None
+    while True:
+        # Raw JSON: building client models is the dominant CPU cost of a LIST
+        r = orjson.loads(fn(limit=LIST_PAGE_SIZE, _request_timeout=API_TIMEOUT, _preload_content=False,
+                            **({'_continue': cont} if cont else {}), **kwargs).data)
+        # Reduce each page before fetching the next, so only one raw page is held at a time
+        for o in r['items']:
+            entries[_key(o['metadata'])] = extract(o)
+        meta = r['metadata']
+        del r
+        if cont is None:
+            rv = meta['resourceVersion']
+        cont = meta.get('continue')
+        if not cont:
+            return entries, rv
+
+
+_METADATA_ACCEPT = 'application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1'
+_METADATA_WATCH_ACCEPT = 'application/json;as=PartialObjectMetadata;g=meta.k8s.io;v=v1'
+_QUERY_PARAMS = {'resource_version': 'resourceVersion', '_continue': 'continue', 'limit': 'limit',
+                 'timeout_seconds': 'timeoutSeconds'}
+
+
+def _metadata_list(path: str) -> Callable:
+    """LIST/WATCH function for `path` that only transfers object metadata"""
+    def list_fn(watch=False, _request_timeout=None, _preload_content=False, **kwargs):
+        query = [(_QUERY_PARAMS[k], v) for k, v in kwargs.items()]
+        if watch:
+            query.append(('watch', 'true'))
+        return core().api_client.call_api(
+            path, 'GET',
+            query_params=query,
+            header_params={'Accept': _METADATA_WATCH_ACCEPT if watch else _METADATA_ACCEPT},
+            auth_settings=['BearerToken'],
+            _return_http_data_only=True,
+            _preload_content=False,
+            _request_timeout=_request_timeout
+        )
+    return list_fn
+
+
+def _key(meta: Dict) -> Tuple[str, str]:
+    return (meta.get('namespace', ''), meta['name'])
+
+
+def _present(obj) -> bool:
+    return True
+
+
+def _namespace_tenant(ns: Dict) -> str:
+    return ns['metadata'].get('labels', {}).get('capsule.clastix.io/tenant')
+
+
+def _pod_entry(pod: Dict) -> tuple:
+    cpu_req = cpu_lim = mem_req = mem_lim = 0
+    for c in pod['spec']['containers']:
+        r = c.get('resources')
+        if r:
+            req = r.get('requests', {})
+            lim = r.get('limits', {})
+            cpu_req += parse_cpu(req.get('cpu', '0'))
+            cpu_lim += parse_cpu(lim.get('cpu', '0'))
+            mem_req += parse_memory(req.get('memory', '0'))
+            mem_lim += parse_memory(lim.get('memory', '0'))
+    phase = pod.get('status', {}).get('phase')
+    return (phase, cpu_req, cpu_lim, mem_req, mem_lim)
+
+
+def _usage_for(ns: str) -> Dict:
+    usage = _ns_usage.get(ns)
+    if usage is None:
+        usage = _ns_usage[ns] = _empty_usage()
     return usage
 
 
+def _release_usage(ns: str, usage: Dict):
+    if not any(usage.values()):
+        del _ns_usage[ns]
+
+
+def _mark_dirty(tenant: str):
+    _dirty_tenants.add(tenant)
+    _dirty.set()
+
+
+def _mark_namespace_dirty(ns: str):
+    tenant = _tenant_by_namespace.get(ns)
+    if tenant is not None:
+        _mark_dirty(tenant)
+
+
+def _on_namespace_change(key: Tuple[str, str], old, new):
+    ns = key[1]
+    if old is not None:
+        _mark_dirty(old)
+        _tenant_by_namespace.pop(ns, None)
+        names = _tenant_namespaces.get(old)
+        if names is not None:
+            names.discard(ns)
+            if not names:
+                del _tenant_namespaces[old]
+    if new is not None:
+        _mark_dirty(new)
+        _tenant_by_namespace[ns] = new
+        _tenant_namespaces.setdefault(new, set()).add(ns)
+
+
+def _on_pod_change(key: Tuple[str, str], old, new):
+    usage = _usage_for(key[0])
+    for entry, sign in ((old, -1), (new, 1)):
+        if entry is None:
+            continue
+        phase, cpu_req, cpu_lim, mem_req, mem_lim = entry
+        usage['pods'] += sign
+        if phase in _PHASE_KEYS:
+            usage[_PHASE_KEYS[phase]] += sign
+        usage['cpu_req'] += sign * cpu_req
+        usage['cpu_lim'] += sign * cpu_lim
+        usage['mem_req'] += sign * mem_req
+        usage['mem_lim'] += sign * mem_lim
+    _release_usage(key[0], usage)
+    _mark_namespace_dirty(key[0])
+
+
+def _counter(field: str) -> Callable:
+    def on_change(key: Tuple[str, str], old, new):
+        usage = _usage_for(key[0])
+        usage[field] += (new is not None) - (old is not None)
+        _release_usage(key[0], usage)
+        _mark_namespace_dirty(key[0])
+    return on_change
+
+
+def start_informers() -> List[Informer]:
+    v1 = core()
+    informers = [
+        Informer('namespaces', v1.list_namespace, _namespace_tenant, _on_namespace_change,
+                 label_selector='capsule.clastix.io/tenant'),
+        Informer('pods', v1.list_pod_for_all_namespaces, _pod_entry, _on_pod_change),
+        # Only counted, so metadata is enough (and secret payloads never leave the apiserver)
+        Informer('services', _metadata_list('/api/v1/services'), _present, _counter('svc')),
+        Informer('configmaps', _metadata_list('/api/v1/configmaps'), _present, _counter('cm')),
+    ]
+    if COUNT_SECRETS:
+        informers.append(Informer('secrets', _metadata_list('/api/v1/secrets'), _present, _counter('secret')))
+    for informer in informers:
+        threading.Thread(target=informer.run, name=f"informer-{informer.name}", daemon=True).start()
+    return informers
+
+
+def list_tenants() -> List[Dict]:
+    with _cache_lock:
+        return list(_tenants.values())
+
+
+def get_namespaces(tenant: str) -> List[str]:
+    with _cache_lock:
+        return sorted(_tenant_namespaces.get(tenant, ()))
+
+
+def get_namespace_usage(ns_name: str) -> Dict:
+    with _cache_lock:
+        usage = _ns_usage.get(ns_name)
+        return dict(usage) if usage is not None else _empty_usage()
+
+
+_aggregate_lock = threading.RLock()
+_tenants_body = b'{}'
+_tenants_expires = 0.0
+# Last gather() result per tenant, reused until the tenant is marked dirty
+_tenant_data: Dict[str, Dict] = {}
+# Hash of the last TenantInfo body applied per CR name
+_applied_hashes: Dict[str, str] = {}
+# Hashes are forgotten periodically, so TenantInfo CRs deleted by hand get re-applied
+_applied_hashes_expires = 0.0
+
+
 def gather(tenant: Dict) -> Dict:
     name = tenant.get('metadata', {}).get('name', 'unknown')
     spec = tenant.get('spec', {})
     namespaces = get_namespaces(name)
     
-    total = {
-        'cpu_req': Decimal('0'), 'cpu_lim': Decimal('0'),
-        'mem_req': Decimal('0'), 'mem_lim': Decimal('0'),
-        'pods': 0, 'pods_run': 0, 'pods_wait': 0, 'pods_fail': 0,
-        'svc': 0, 'cm': 0, 'secret': 0
-    }
-    
-    for ns in namespaces:
-        u = get_namespace_usage(ns)
-        for k in total:
-            total[k] += u[k]
+    if not namespaces:
+        total = _empty_usage()
+    elif len(namespaces) == 1:
+        # Most tenants own a single namespace: its bucket is already the total
+        total = get_namespace_usage(namespaces[0])
+    else:
+        total = _empty_usage()
+        # Sum the informer's per-namespace buckets in place rather than copying each one
+        with _cache_lock:
+            for ns in namespaces:
+                u = _ns_usage.get(ns)
+                if u is not None:
+                    for k in total:
+                        total[k] += u[k]
     
     cpu_pct = 0
     if total['cpu_lim'] > 0:
-        cpu_pct = float(total['cpu_req'] / total['cpu_lim'] * 100)
+        cpu_pct = total['cpu_req'] / total['cpu_lim'] * 100
     
     mem_pct = 0
     if total['mem_lim'] > 0:
-        mem_pct = float(total['mem_req'] / total['mem_lim'] * 100)
+        mem_pct = total['mem_req'] / total['mem_lim'] * 100
     
     health_score = 100
     if cpu_pct > 0:
@@ -271,10 +625,10 @@ def gather(tenant: Dict) -> Dict:
         'name': name,
         'namespaces': namespaces,
         'namespace_count': len(namespaces),
-        'cpu_req': float(total['cpu_req']),
-        'cpu_lim': float(total['cpu_lim']),
-        'mem_req': float(total['mem_req']),
-        'mem_lim': float(total['mem_lim']),
+        'cpu_req': total['cpu_req'],
+        'cpu_lim': total['cpu_lim'],
+        'mem_req': total['mem_req'],
+        'mem_lim': total['mem_lim'],
         'cpu_pct': cpu_pct,
         'mem_pct': mem_pct,
         'pods': total['pods'],
@@ -290,213 +644,313 @@ def gather(tenant: Dict) -> Dict:
     }
 
 
-def update_metrics(tenants: List[Dict]):
-    metrics.clear()
-    
-    total_cpu = Decimal('0')
-    total_mem = Decimal('0')
+def update_tenant_metrics(t: Dict):
+    metrics.tenant_namespace_count(t['name'], t['namespace_count'])
+    metrics.tenant_cpu_requested(t['name'], t['cpu_req'] / 1000)
+    metrics.tenant_cpu_limit(t['name'], t['cpu_lim'] / 1000)
+    metrics.tenant_memory_requested(t['name'], float(t['mem_req']))
+    metrics.tenant_memory_limit(t['name'], float(t['mem_lim']))
+    metrics.tenant_cpu_pct(t['name'], t['cpu_pct'])
+    metrics.tenant_memory_pct(t['name'], t['mem_pct'])
+    metrics.tenant_pods(t['name'], 'total', t['pods'])
+    metrics.tenant_pods(t['name'], 'running', t['pods_run'])
+    metrics.tenant_pods(t['name'], 'pending', t['pods_wait'])
+    metrics.tenant_pods(t['name'], 'failed', t['pods_fail'])
+    metrics.tenant_services(t['name'], t['svc'])
+    metrics.tenant_health(t['name'], t['health_score'], t['health_status'])
+
+
+def update_metrics(tenants: List[Dict]) -> Dict:
+    """Refresh cluster totals and re-render; per-tenant series are set by update_tenant_metrics.
+
+    Returns the totals so aggregate() can build its summary without re-walking the tenants.
+    """
+    total_ns = 0
+    total_cpu = 0
+    total_mem = 0
     total_pods = 0
-    health_scores = []
+    total_health = 0
     
     for t in tenants:
-        metrics.tenant_namespace_count(t['name'], t['namespace_count'])
-        metrics.tenant_cpu_requested(t['name'], t['cpu_req'])
-        metrics.tenant_cpu_limit(t['name'], t['cpu_lim'])
-        metrics.tenant_memory_requested(t['name'], t['mem_req'])
-        metrics.tenant_memory_limit(t['name'], t['mem_lim'])
-        metrics.tenant_cpu_pct(t['name'], t['cpu_pct'])
-        metrics.tenant_memory_pct(t['name'], t['mem_pct'])
-        metrics.tenant_pods(t['name'], 'total', t['pods'])
-        metrics.tenant_pods(t['name'], 'running', t['pods_run'])
-        metrics.tenant_pods(t['name'], 'pending', t['pods_wait'])
-        metrics.tenant_pods(t['name'], 'failed', t['pods_fail'])
-        metrics.tenant_services(t['name'], t['svc'])
-        metrics.tenant_health(t['name'], t['health_score'], t['health_status'])
-        
-        total_cpu += to_decimal(t['cpu_req'])
-        total_mem += to_decimal(t['mem_req'])
+        total_ns += t['namespace_count']
+        total_cpu += t['cpu_req']
+        total_mem += t['mem_req']
         total_pods += t['pods']
-        health_scores.append(t['health_score'])
+        total_health += t['health_score']
     
     metrics.total_tenants(len(tenants))
-    metrics.total_namespaces(sum(t['namespace_count'] for t in tenants))
-    metrics.total_cpu(float(total_cpu))
+    metrics.total_namespaces(total_ns)
+    metrics.total_cpu(total_cpu / 1000)
     metrics.total_memory(float(total_mem))
     metrics.total_pods(total_pods)
     
-    avg_health = sum(health_scores) / len(health_scores) if health_scores else 100
+    avg_health = total_health / len(tenants) if tenants else 100
     status = 'healthy' if avg_health >= 90 else 'warning' if avg_health >= 70 else 'critical'
     metrics.cluster_health(avg_health, status)
-
-
-def aggregate() -> Dict:
-    tenants = list_tenants()
-    
-    if not tenants:
-        update_metrics([])
-        sync_tenant_infos([])
-        return {'total_tenants': 0, 'tenants': [], 'summary': {}}
-    
-    data = [gather(t) for t in tenants]
-    update_metrics(data)
-    sync_tenant_infos(data)
-    
-    total_cpu = sum(to_decimal(t['cpu_req']) for t in data)
-    total_mem = sum(to_decimal(t['mem_req']) for t in data)
-    total_pods = sum(t['pods'] for t in data)
-    avg_health = sum(t['health_score'] for t in data) / len(data)
+    metrics.render()
     
     return {
-        'timestamp': datetime.now().isoformat(),
-        'total_tenants': len(tenants),
-        'tenants': data,
-        'summary': {
-            'total_namespaces': sum(t['namespace_count'] for t in data),
-            'total_cpu': format_cpu(total_cpu),
-            'total_memory': format_memory(total_mem),
-            'total_pods': total_pods,
-            'health_score': float(avg_health)
-        }
+        'namespaces': total_ns,
+        'cpu_req': total_cpu,
+        'mem_req': total_mem,
+        'pods': total_pods,
+        'health_score': avg_health
     }
 
 
+def _tenant_json(t: Dict) -> Dict:
+    """Tenant as served by /tenants: CPU in cores and memory in bytes, as floats"""
+    return {**t,
+            'cpu_req': t['cpu_req'] / 1000, 'cpu_lim': t['cpu_lim'] / 1000,
+            'mem_req': float(t['mem_req']), 'mem_lim': float(t['mem_lim'])}
+
+
+def aggregate() -> Dict:
+    global _tenants_body, _tenants_expires, _dirty_tenants, _applied_hashes_expires
+    with _aggregate_lock:
+        with _cache_lock:
+            dirty, _dirty_tenants = _dirty_tenants, set()
+            tenants = {t['metadata']['name']: t for t in list_tenants()}
+            # One locked pass, so every tenant is gathered from the same informer state
+            fresh = {name: gather(tenant) for name, tenant in tenants.items()
+                     if name in dirty or name not in _tenant_data}
+        
+        for name in [n for n in _tenant_data if n not in tenants]:
+            del _tenant_data[name]
+            _applied_hashes.pop(f"{name}-info", None)
+            metrics.delete_tenant(name)
+        for name, t in fresh.items():
+            _tenant_data[name] = t
+            update_tenant_metrics(t)
+        
+        data = list(_tenant_data.values())
+        totals = update_metrics(data)
+        now = time.monotonic()
+        if now >= _applied_hashes_expires:
+            _applied_hashes.clear()
+            _applied_hashes_expires = now + APPLIED_HASHES_TTL
+        sync_tenant_infos(data)
+        
+        if not data:
+            result = {'total_tenants': 0, 'tenants': [], 'summary': {}}
+        else:
+            result = {
+                'timestamp': datetime.now().isoformat(),
+                'total_tenants': len(data),
+                'tenants': [_tenant_json(t) for t in data],
+                'summary': {
+                    'total_namespaces': totals['namespaces'],
+                    'total_cpu': format_cpu(totals['cpu_req']),
+                    'total_memory': format_memory(totals['mem_req']),
+                    'total_pods': totals['pods'],
+                    'health_score': float(totals['health_score'])
+                }
+            }
+        
+        _tenants_body = orjson.dumps(result)
+        _tenants_expires = time.monotonic() + TENANTS_TTL
+        return result
+
+
+def tenants_body() -> bytes:
+    """Last aggregate() as JSON, re-aggregated once older than TENANTS_TTL"""
+    if time.monotonic() >= _tenants_expires:
+        with _aggregate_lock:
+            # another request may have refreshed it while we waited for the lock
+            if time.monotonic() >= _tenants_expires:
+                aggregate()
+    return _tenants_body
+
+
 def sync_tenant_infos(tenants_data: List[Dict]):
     """Create or update TenantInfo CR for each tenant - available via kubectl get ti"""
+    list(EXECUTOR.map(_sync_tenant_info, tenants_data))
+
+
+def _sync_tenant_info(t: Dict):
     operator_ns = "tenant-observer"
     
-    for t in tenants_data:
-        name = t['name']
-        ti_name = f"{name}-info"
-        
-        ti_data = {
-            'apiVersion': 'operators.clastix.io/v1',
-            'kind': 'TenantInfo',
-            'metadata': {
-                'name': ti_name,
-                'namespace': operator_ns,
-                'labels': {
-                    'tenant': name
-                }
-            },
-            'spec': {
-                'name': name,
-                'namespaces': t['namespaces'],
-                'namespace_count': t['namespace_count'],
-                'resources': {
-                    'cpu': {
-                        'requested': {'value': format_cpu(to_decimal(t['cpu_req'])), 'raw_milli': int(t['cpu_req']), 'percentage': round(t['cpu_pct'], 2), 'percentage_display': f"{t['cpu_pct']:.1f}%", 'status': 'ok'},
-                        'limit': {'value': format_cpu(to_decimal(t['cpu_lim'])), 'raw_milli': int(t['cpu_lim'])},
-                        'usage': {'value': format_cpu(to_decimal(t['cpu_req'])), 'raw_milli': int(t['cpu_req']), 'percentage': round(t['cpu_pct'], 2), 'percentage_display': f"{t['cpu_pct']:.1f}%"},
-                        'utilization_efficiency': round(t['cpu_pct'], 2)
-                    },
-                    'memory': {
-                        'requested': {'value': format_memory(to_decimal(t['mem_req'])), 'raw_bytes': int(t['mem_req']), 'percentage': round(t['mem_pct'], 2), 'percentage_display': f"{t['mem_pct']:.1f}%", 'status': 'ok'},
-                        'limit': {'value': format_memory(to_decimal(t['mem_lim'])), 'raw_bytes': int(t['mem_lim'])},
-                        'usage': {'value': format_memory(to_decimal(t['mem_req'])), 'raw_bytes': int(t['mem_req']), 'percentage': round(t['mem_pct'], 2), 'percentage_display': f"{t['mem_pct']:.1f}%"},
-                        'utilization_efficiency': round(t['mem_pct'], 2)
-                    },
-                    'pods': {
-                        'requested': t['pods'],
-                        'running': t['pods_run'],
-                        'pending': t['pods_wait'],
-                        'failed': t['pods_fail'],
-                        'percentage': f"{t['pods'] / max(t['pods'], 1) * 100:.0f}%",
-                        'status': 'ok'
-                    },
-                    'storage': {'requested': {'value': '0', 'raw_bytes': 0}, 'limit': {'value': '0', 'raw_bytes': 0}},
-                    'services': {'count': t['svc']},
-                    'configmaps': {'count': t['cm']},
-                    'secrets': {'count': t['secret']},
-                    'ingresses': {'count': 0},
-                    'health_score': {'score': t['health_score'], 'status': t['health_status'], 'details': {}}
+    name = t['name']
+    ti_name = f"{name}-info"
+    
+    # Each of these is used more than once below
+    cpu_req_str = format_cpu(t['cpu_req'])
+    cpu_lim_str = format_cpu(t['cpu_lim'])
+    mem_req_str = format_memory(t['mem_req'])
+    mem_lim_str = format_memory(t['mem_lim'])
+    cpu_pct = round(t['cpu_pct'], 2)
+    mem_pct = round(t['mem_pct'], 2)
+    cpu_pct_display = f"{t['cpu_pct']:.1f}%"
+    mem_pct_display = f"{t['mem_pct']:.1f}%"
+    
+    ti_data = {
+        'apiVersion': 'operators.clastix.io/v1',
+        'kind': 'TenantInfo',
+        'metadata': {
+            'name': ti_name,
+            'namespace': operator_ns,
+            'labels': {
+                'tenant': name
+            }
+        },
+        'spec': {
+            'name': name,
+            'namespaces': t['namespaces'],
+            'namespace_count': t['namespace_count'],
+            'resources': {
+                'cpu': {
+                    'requested': {'value': cpu_req_str, 'raw_milli': t['cpu_req'], 'percentage': cpu_pct, 'percentage_display': cpu_pct_display, 'status': 'ok'},
+                    'limit': {'value': cpu_lim_str, 'raw_milli': t['cpu_lim']},
+                    'usage': {'value': cpu_req_str, 'raw_milli': t['cpu_req'], 'percentage': cpu_pct, 'percentage_display': cpu_pct_display},
+                    'utilization_efficiency': cpu_pct
                 },
-                'owners': t.get('owners', [])
-            },
-            'status': {
-                'phase': 'Active',
-                'state': t['health_status']
+                'memory': {
+                    'requested': {'value': mem_req_str, 'raw_bytes': t['mem_req'], 'percentage': mem_pct, 'percentage_display': mem_pct_display, 'status': 'ok'},
+                    'limit': {'value': mem_lim_str, 'raw_bytes': t['mem_lim']},
+                    'usage': {'value': mem_req_str, 'raw_bytes': t['mem_req'], 'percentage': mem_pct, 'percentage_display': mem_pct_display},
+                    'utilization_efficiency': mem_pct
+                },
+                'pods': {
+                    'requested': t['pods'],
+                    'running': t['pods_run'],
+                    'pending': t['pods_wait'],
+                    'failed': t['pods_fail'],
+                    'percentage': f"{t['pods'] / max(t['pods'], 1) * 100:.0f}%",
+                    'status': 'ok'
+                },
+                'storage': {'requested': {'value': '0', 'raw_bytes': 0}, 'limit': {'value': '0', 'raw_bytes': 0}},
+                'services': {'count': t['svc']},
+                'configmaps': {'count': t['cm']},
+                'secrets': {'count': t['secret']},
+                'ingresses': {'count': 0},
+                'health_score': {'score': t['health_score'], 'status': t['health_status'], 'details': {}}
             },
-            'health': {
-                'score': t['health_score'],
-                'status': t['health_status'],
-                'details': {}
-            }
+            'owners': t.get('owners', [])
+        },
+        'status': {
+            'phase': 'Active',
+            'state': t['health_status']
+        },
+        'health': {
+            'score': t['health_score'],
+            'status': t['health_status'],
+            'details': {}
         }
-        
-        try:
-            # Try to get existing
-            crd().get_namespaced_custom_object(
-                group="operators.clastix.io",
-                version="v1",
-                namespace=operator_ns,
-                plural="tenantinfos",
-                name=ti_name
-            )
-            # Update existing
-            crd().patch_namespaced_custom_object(
-                group="operators.clastix.io",
-                version="v1",
-                namespace=operator_ns,
-                plural="tenantinfos",
-                name=ti_name,
-                body=ti_data
-            )
-            logger.debug(f"Updated TenantInfo: {ti_name}")
-        except:
-            # Create new
-            try:
-                crd().create_namespaced_custom_object(
-                    group="operators.clastix.io",
-                    version="v1",
-                    namespace=operator_ns,
-                    plural="tenantinfos",
-                    body=ti_data
-                )
-                logger.debug(f"Created TenantInfo: {ti_name}")
-            except Exception as e:
-                logger.warning(f"Failed to create TenantInfo {ti_name}: {e}")
+    }
+    
+    digest = hashlib.sha256(orjson.dumps(ti_data, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    if _applied_hashes.get(ti_name) == digest:
+        return
+    # Throttled: leave the hash unset so the next reconcile retries it
+    if time.monotonic() < _throttled_until:
+        return
+    
+    try:
+        _apply_tenant_info(operator_ns, ti_name, ti_data)
+        _applied_hashes[ti_name] = digest
+        logger.debug(f"Applied TenantInfo: {ti_name}")
+    except kubernetes.client.exceptions.ApiException as e:
+        if e.status in (429, 503):
+            _throttle(e)
+        logger.warning(f"Failed to apply TenantInfo {ti_name}: {e.status} {e.reason}")
+    except urllib3.exceptions.HTTPError as e:
+        logger.warning(f"Failed to apply TenantInfo {ti_name}: {e}")
+
+
+_apply_ti = None
+
+
+def _apply_tenant_info(namespace: str, name: str, body: Dict):
+    """Server-side apply: one PATCH creates or updates, diffed by the apiserver"""
+    global _apply_ti
+    if _apply_ti is None:
+        # Everything but the target and body is constant; bind it once (needs a loaded config).
+        # The generated patch_* methods always send merge-patch, so go through call_api.
+        _apply_ti = functools.partial(
+            crd().api_client.call_api,
+            '/apis/operators.clastix.io/v1/namespaces/{namespace}/tenantinfos/{name}', 'PATCH',
+            query_params=[('fieldManager', OPERATOR_NAME), ('force', 'true')],
+            header_params={'Accept': 'application/json', 'Content-Type': 'application/apply-patch+yaml'},
+            auth_settings=['BearerToken'],
+            response_type='object',
+            _return_http_data_only=True,
+            _request_timeout=API_TIMEOUT
+        )
+    return _apply_ti(path_params={'namespace': namespace, 'name': name}, body=body)
 
 
 class Handler(BaseHTTPRequestHandler):
+    # Every response carries Content-Length, so connections can be kept alive
+    protocol_version = 'HTTP/1.1'
+
     def do_GET(self):
         if self.path == '/health':
-            self.send_response(200)
-            self.end_headers()
-            self.wfile.write(b'OK')
+            self._send(200, 'text/plain', b'OK')
         elif self.path == '/metrics':
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/plain')
-            self.end_headers()
-            self.wfile.write(metrics.generate().encode())
+            self._send(200, 'text/plain', metrics._cached_bytes)
         elif self.path == '/tenants':
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(aggregate(), default=str).encode())
+            self._send(200, 'application/json', tenants_body())
         else:
-            self.send_response(404)
+            self._send(404, 'text/plain', b'')
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
+        if len(body) <= WRITE_CHUNK_THRESHOLD:
+            self.wfile.write(body)
+            return
+        view = memoryview(body)
+        for i in range(0, len(view), WRITE_CHUNK_SIZE):
+            self.wfile.write(view[i:i + WRITE_CHUNK_SIZE])
 
     def log_message(self, *args):
         pass
 
 
 def run_server(port=8080):
-    HTTPServer(('0.0.0.0', port), Handler).serve_forever()
+    # One thread per request: a slow scrape must not hold up /health or /tenants
+    server = ThreadingHTTPServer(('0.0.0.0', port), Handler)
+    server.daemon_threads = True
+    server.serve_forever()
+
+
+def run_reconciler(interval=RECONCILE_INTERVAL, idle=RECONCILE_IDLE):
+    """Reconcile when something is marked dirty, and every `interval` seconds regardless"""
+    while True:
+        if _dirty.wait(timeout=interval):
+            # let a burst of events settle so it costs a single aggregate()
+            time.sleep(idle)
+        _dirty.clear()
+        delay = _throttled_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            aggregate()
+        except Exception as e:
+            logger.warning(f"Periodic reconcile failed: {e}")
 
 
 @kopf.on.event('capsule.clastix.io', 'v1beta1', 'tenants')
-def on_tenant_event(body, **kwargs):
+def on_tenant_event(event, body, **kwargs):
     name = body.get('metadata', {}).get('name', 'unknown')
     logger.info(f"Event for tenant: {name}")
-    aggregate()
+    with _cache_lock:
+        if event['type'] == 'DELETED':
+            _tenants.pop(name, None)
+        else:
+            _tenants[name] = {'metadata': {'name': name}, 'spec': body.get('spec', {})}
+        _mark_dirty(name)
 
 
 if __name__ == '__main__':
     kubernetes.config.load_incluster_config()
     logger.info(f"Operator {OPERATOR_NAME} started")
     
+    start_informers()
     threading.Thread(target=run_server, daemon=True).start()
+    threading.Thread(target=run_reconciler, daemon=True).start()
     
     kopf.run(
         registry=kopf.get_default_registry(),